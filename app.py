@@ -1,106 +1,266 @@
 import gradio as gr
+import os
 import re
 import difflib
-from typing import List, Tuple, Dict, Any
+import hashlib
+import html
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Tuple, Dict, Any, Optional, Iterator
 from src.llm import LLMProcessor
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Set up logging (set LOG_LEVEL=DEBUG to include full NER results)
+_log_level_name = os.environ.get("LOG_LEVEL") or "INFO"
+_log_level = logging.getLevelName(_log_level_name.upper())
+_log_level_valid = isinstance(_log_level, int)
+logging.basicConfig(level=_log_level if _log_level_valid else logging.INFO)
 logger = logging.getLogger(__name__)
+if not _log_level_valid:
+    logger.warning("Unknown LOG_LEVEL %r, using INFO", _log_level_name)
 
-# Initialize the LLM processor
-llm_processor = LLMProcessor()
+_llm_processor: Optional[LLMProcessor] = None
+_llm_processor_lock = threading.Lock()
 
-def parse_labels_input(labels_text: str) -> List[str]:
-    """Parse the labels input text into a list of labels."""
-    if not labels_text.strip():
+def get_llm_processor() -> LLMProcessor:
+    """Return the shared LLM processor, creating the GenAI client on first use.
+    
+    Deferring this out of import time lets worker processes fork before the client
+    (and its connections) exist, and lets the UI start before credentials are needed.
+    The lock keeps concurrent first calls (e.g. warm-up and a request) from building two.
+    """
+    global _llm_processor
+    if _llm_processor is None:
+        with _llm_processor_lock:
+            if _llm_processor is None:
+                _llm_processor = LLMProcessor()
+    return _llm_processor
+
+def warm_up_llm_processor() -> None:
+    """Create the shared LLM processor and warm up its connection, only logging failures."""
+    try:
+        get_llm_processor().warm_up()
+    except Exception as e:
+        logger.warning(f"LLM processor warm-up failed: {str(e)}")
+
+# Pattern to match markdown annotations [entity](LABEL). Brackets/parentheses are
+# excluded inside the groups so a failed match stops at the next opening one,
+# keeping the scan linear on inputs like "[[[[..." instead of quadratic.
+_ANNOT_RE = re.compile(r'\[([^\[\]]+)\]\(([^()]+)\)')
+
+# Color palette for the different entity types
+ENTITY_COLORS = (
+    "#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FFEAA7",
+    "#DDA0DD", "#98D8C8", "#F7DC6F", "#BB8FCE", "#85C1E9"
+)
+
+# Indicator colors and table CSS classes for low (<=0.6), medium and high (>0.8) confidence
+CONFIDENCE_COLORS = ("#FF6B6B", "#FFAA00", "#00AA00")
+CONFIDENCE_CLASSES = ("confidence-low", "confidence-medium", "confidence-high")
+
+def confidence_level(confidence: float) -> int:
+    """Bucket a confidence score into 0 (low), 1 (medium) or 2 (high)."""
+    return (confidence > 0.6) + (confidence > 0.8)
+
+# Separator between comma-separated entity labels
+_LABEL_SPLIT_RE = re.compile(r'\s*,\s*')
+
+# Input limits - anything larger is rejected before reaching the LLM (or, for
+# the diff, summarized instead of diffed line by line)
+MAX_TEXT_LENGTH = 20_000
+MAX_LABELS = 32
+MAX_DIFF_LINES = 2_000
+
+# Texts in the batch input are separated by blank lines
+_BATCH_SPLIT_RE = re.compile(r'\n\s*\n')
+
+# Exact-match LRU cache of NER results keyed on a digest of (text, sorted labels)
+NER_CACHE_SIZE = 512
+_ner_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+_ner_cache_lock = threading.Lock()
+
+def ner_cache_key(text: str, labels: List[str]) -> bytes:
+    """Digest of the text and (order-insensitive) label set, so cache keys stay small for long inputs."""
+    # Length prefix keeps a NUL inside the text from shifting the text/label boundary
+    key_source = "\0".join([str(len(text)), text, *sorted(set(labels))])
+    return hashlib.blake2b(key_source.encode("utf-8"), digest_size=16).digest()
+
+def cached_perform_ner_stream(text: str, labels: List[str]) -> Iterator[Dict[str, Any]]:
+    """Stream NER results from the LLM, reusing results for repeated text/label combinations.
+    
+    Yields partial results (marked with ``"partial": True``) while the model is generating,
+    then the final result. Cache hits yield only the final result.
+    """
+    key = ner_cache_key(text, labels)
+    with _ner_cache_lock:
+        cached = _ner_cache.get(key)
+        if cached is not None:
+            _ner_cache.move_to_end(key)
+    # Yield outside the lock - a suspended generator must not hold it
+    if cached is not None:
+        logger.info("NER cache hit")
+        yield cached
+        return
+    
+    ner_result = {"annotated_text": text, "entities": []}
+    for ner_result in get_llm_processor().perform_ner_stream(text, labels):
+        if ner_result.get("partial"):
+            yield ner_result
+    
+    # Only cache responses that produced entities so failed calls can be retried
+    if ner_result.get("entities"):
+        with _ner_cache_lock:
+            _ner_cache[key] = ner_result
+            _ner_cache.move_to_end(key)
+            while len(_ner_cache) > NER_CACHE_SIZE:
+                _ner_cache.popitem(last=False)
+    
+    yield ner_result
+
+DIFF_PLACEHOLDER = "*Text differences will appear here*"
+
+# Rendered outputs for recently served NER results, so cache hits skip the
+# visualization/table/diff work as well. Keyed on the identity of the cached
+# result object; the object itself is kept in the value to guard against id reuse.
+RENDER_CACHE_SIZE = 128
+_render_cache: "OrderedDict[Tuple[str, int], Tuple[Dict[str, Any], Tuple[str, str, str]]]" = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+@lru_cache(maxsize=64)
+def parse_labels_input(labels_text: str) -> Tuple[str, ...]:
+    """Parse the labels input text into a tuple of labels.
+    
+    Results are memoized, so a tuple is returned to keep callers from mutating the cached value.
+    """
+    labels_text = labels_text.strip()
+    if not labels_text:
+        return ()
+    
+    # Uppercase once, then split by comma and the whitespace around it;
+    # duplicates are dropped while keeping the order the user typed
+    labels = _LABEL_SPLIT_RE.split(labels_text.upper())
+    return tuple(dict.fromkeys(label for label in labels if label))
+
+def find_annotations(annotated_text: str) -> List[re.Match]:
+    """Find all markdown annotations [entity](LABEL) in the text, in order."""
+    if '[' not in annotated_text:
         return []
+    return list(_ANNOT_RE.finditer(annotated_text))
+
+def _substitute_annotations(text: str, matches: List[re.Match], repl, escape_text: bool = False) -> str:
+    """Replace each precomputed annotation match in text with repl(match).
     
-    # Split by comma and clean up
-    labels = [label.strip().upper() for label in labels_text.split(',')]
-    return [label for label in labels if label]
+    With ``escape_text`` the text between matches is HTML-escaped, for building markup.
+    """
+    escape = html.escape if escape_text else str
+    parts = []
+    last_end = 0
+    for match in matches:
+        start, end = match.span()
+        parts.append(escape(text[last_end:start]))
+        parts.append(repl(match))
+        last_end = end
+    parts.append(escape(text[last_end:]))
+    return ''.join(parts)
 
-def strip_markdown_annotations(text: str) -> str:
+def strip_markdown_annotations(text: str, matches: Optional[List[re.Match]] = None) -> str:
     """Remove markdown annotations [entity](LABEL) from text, keeping only the entity."""
-    # Pattern to match [entity](LABEL)
-    pattern = r'\[([^\]]+)\]\([^)]+\)'
-    return re.sub(pattern, r'\1', text)
+    if matches is None:
+        matches = find_annotations(text)
+    # Nothing to strip - return the text untouched
+    if not matches:
+        return text
+    return _substitute_annotations(text, matches, lambda match: match.group(1))
 
 def extract_entities(annotated_text: str) -> List[Tuple[str, str]]:
     """Extract entities and their labels from annotated text."""
-    pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-    return re.findall(pattern, annotated_text)
+    return _ANNOT_RE.findall(annotated_text)
 
-def create_entity_visualization(ner_result: Dict[str, Any]) -> str:
-    """Create a visual representation of entities with color coding and Wikidata information."""
+def render_entity_span(entity_text: str, label: str, entity: Dict[str, Any], color: str) -> str:
+    """Render one annotated entity as a color-coded HTML span with tooltip and Wikidata link."""
+    wikidata_id = entity.get("wikidata_id", "")
+    description = entity.get("description", "")
+    confidence = entity.get("confidence", 0.0)
+    
+    # Create tooltip with entity information
+    tooltip_parts = [f"Type: {label}"]
+    if wikidata_id:
+        tooltip_parts.append(f"Wikidata: {wikidata_id}")
+    if description:
+        tooltip_parts.append(f"Description: {description}")
+    tooltip_parts.append(f"Confidence: {confidence:.2f}")
+    tooltip_content = html.escape("\\n".join(tooltip_parts))
+    
+    # Create Wikidata link if available
+    wikidata_link = ""
+    if wikidata_id:
+        wikidata_link = f' <a href="https://www.wikidata.org/wiki/{html.escape(wikidata_id)}" target="_blank" style="text-decoration: none; color: #0645ad;">🔗</a>'
+    
+    # Confidence indicator
+    confidence_color = CONFIDENCE_COLORS[confidence_level(confidence)]
+    confidence_indicator = f'<span style="color: {confidence_color}; font-size: 0.8em;">●</span>'
+    
+    # Model output is untrusted - escape it before it becomes markup
+    entity_text = html.escape(entity_text)
+    label = html.escape(label)
+    
+    # Single-line markup: the browser collapses the whitespace anyway
+    return (
+        f'<span style="background-color: {color}; padding: 2px 4px; border-radius: 3px; font-weight: bold; cursor: help;" '
+        f'title="{tooltip_content}">{entity_text} <sub style="font-size: 0.7em;">({label})</sub> '
+        f'{confidence_indicator}{wikidata_link} </span>'
+    )
+
+def create_entity_visualization(ner_result: Dict[str, Any], matches: Optional[List[re.Match]] = None) -> str:
+    """Create a visual representation of entities with color coding and Wikidata information.
+    
+    ``matches`` may be passed in when the annotations of ``ner_result["annotated_text"]``
+    have already been found, so the text is not scanned again.
+    """
     if not ner_result or "entities" not in ner_result:
         return "No entities found."
     
     annotated_text = ner_result.get("annotated_text", "")
     entities = ner_result.get("entities", [])
     
-    # Create a color map for different entity types
-    colors = [
-        "#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FFEAA7", 
-        "#DDA0DD", "#98D8C8", "#F7DC6F", "#BB8FCE", "#85C1E9"
-    ]
+    # Nothing to highlight - show the text as returned (escaped, it is model output)
+    if not entities:
+        return html.escape(annotated_text)
     
-    unique_labels = list(set(entity.get("label", "") for entity in entities))
-    color_map = {label: colors[i % len(colors)] for i, label in enumerate(unique_labels)}
+    if matches is None:
+        matches = find_annotations(annotated_text)
+    if not matches:
+        return html.escape(annotated_text)
     
-    # Replace annotations with enriched HTML spans
-    result = annotated_text
+    # In one pass over the entities, assign colors in order of first appearance (so they
+    # are stable across runs) and group entities by their annotation so each match can
+    # pick up its metadata
+    num_colors = len(ENTITY_COLORS)
+    color_map = {}
+    entities_by_annotation = {}
     for entity in entities:
-        entity_text = entity.get("text", "")
         label = entity.get("label", "")
-        wikidata_id = entity.get("wikidata_id", "")
-        description = entity.get("description", "")
-        confidence = entity.get("confidence", 0.0)
-        
-        color = color_map.get(label, "#CCCCCC")
-        
-        # Create tooltip with entity information
-        tooltip_content = f"Type: {label}"
-        if wikidata_id:
-            tooltip_content += f"\\nWikidata: {wikidata_id}"
-        if description:
-            tooltip_content += f"\\nDescription: {description}"
-        tooltip_content += f"\\nConfidence: {confidence:.2f}"
-        
-        # Create Wikidata link if available
-        wikidata_link = ""
-        if wikidata_id:
-            wikidata_link = f' <a href="https://www.wikidata.org/wiki/{wikidata_id}" target="_blank" style="text-decoration: none; color: #0645ad;">🔗</a>'
-        
-        # Confidence indicator
-        confidence_color = "#00AA00" if confidence > 0.8 else "#FFAA00" if confidence > 0.6 else "#FF6B6B"
-        confidence_indicator = f'<span style="color: {confidence_color}; font-size: 0.8em;">●</span>'
-        
-        original_pattern = f"[{re.escape(entity_text)}]({re.escape(label)})"
-        replacement = f'''<span style="background-color: {color}; padding: 2px 4px; border-radius: 3px; font-weight: bold; cursor: help;" 
-                          title="{tooltip_content}">
-                          {entity_text} 
-                          <sub style="font-size: 0.7em;">({label})</sub>
-                          {confidence_indicator}
-                          {wikidata_link}
-                        </span>'''
-        
-        result = result.replace(f"[{entity_text}]({label})", replacement, 1)
-    
-    return result
-
-def create_entity_table(ner_result: Dict[str, Any]) -> str:
-    """Create an HTML table for entity validation and editing."""
-    if not ner_result or "entities" not in ner_result:
-        return "<p>No entities to validate.</p>"
+        if label not in color_map:
+            color_map[label] = ENTITY_COLORS[len(color_map) % num_colors]
+        entities_by_annotation.setdefault((entity.get("text", ""), label), []).append(entity)
+    pending = {key: iter(group) for key, group in entities_by_annotation.items()}
     
-    entities = ner_result.get("entities", [])
-    if not entities:
-        return "<p>No entities found.</p>"
+    def _repl(match: re.Match) -> str:
+        entity_text, label = match.group(1), match.group(2)
+        group = pending.get((entity_text, label))
+        entity = next(group, None) if group is not None else None
+        if entity is None:
+            # Annotation without a matching entity record - leave it as text
+            return html.escape(match.group(0))
+        return render_entity_span(entity_text, label, entity, color_map.get(label, "#CCCCCC"))
     
-    # Create HTML table
-    table_html = """
+    # Replace annotations with enriched HTML spans in a single pass, escaping the
+    # model-supplied text around them
+    return _substitute_annotations(annotated_text, matches, _repl, escape_text=True)
+
+# Static markup around the entity validation table rows
+ENTITY_TABLE_HEADER = """
     <style>
         .entity-table {
             width: 100%;
@@ -144,6 +304,29 @@ def create_entity_table(ner_result: Dict[str, Any]) -> str:
         </thead>
         <tbody>
     """
+
+ENTITY_TABLE_FOOTER = """
+        </tbody>
+    </table>
+    <p style="font-size: 0.9em; color: #666;">
+        <strong>Legend:</strong> 
+        <span class="confidence-high">●</span> High confidence (>0.8) |
+        <span class="confidence-medium">●</span> Medium confidence (0.6-0.8) |
+        <span class="confidence-low">●</span> Low confidence (<0.6)
+    </p>
+    """
+
+def create_entity_table(ner_result: Dict[str, Any]) -> str:
+    """Create an HTML table for entity validation and editing."""
+    if not ner_result or "entities" not in ner_result:
+        return "<p>No entities to validate.</p>"
+    
+    entities = ner_result.get("entities", [])
+    if not entities:
+        return "<p>No entities found.</p>"
+    
+    # Build the table from a list of parts and join once at the end
+    parts = [ENTITY_TABLE_HEADER]
     
     for i, entity in enumerate(entities):
         entity_text = entity.get("text", "")
@@ -155,14 +338,10 @@ def create_entity_table(ner_result: Dict[str, Any]) -> str:
         confidence = entity.get("confidence", 0.0)
         
         # Confidence styling
-        if confidence > 0.8:
-            confidence_class = "confidence-high"
-        elif confidence > 0.6:
-            confidence_class = "confidence-medium"
-        else:
-            confidence_class = "confidence-low"
+        confidence_class = CONFIDENCE_CLASSES[confidence_level(confidence)]
         
         # Wikidata link
+        wikidata_id = html.escape(wikidata_id)
         wikidata_cell = ""
         if wikidata_id:
             wikidata_cell = f'<a href="https://www.wikidata.org/wiki/{wikidata_id}" target="_blank" class="wikidata-link">{wikidata_id}</a>'
@@ -173,7 +352,12 @@ def create_entity_table(ner_result: Dict[str, Any]) -> str:
         if len(description) > 60:
             description = description[:57] + "..."
         
-        table_html += f"""
+        # Model output is untrusted - escape it before it becomes markup
+        entity_text = html.escape(entity_text)
+        label = html.escape(label)
+        description = html.escape(description)
+        
+        parts.append(f"""
             <tr>
                 <td><strong>{entity_text}</strong></td>
                 <td>{label}</td>
@@ -186,30 +370,35 @@ def create_entity_table(ner_result: Dict[str, Any]) -> str:
                     <button onclick="alert('Entity editing feature coming soon!')" style="background: #ff9800; color: white; border: none; padding: 4px 8px; border-radius: 3px; cursor: pointer;">✏️</button>
                 </td>
             </tr>
-        """
+        """)
     
-    table_html += """
-        </tbody>
-    </table>
-    <p style="font-size: 0.9em; color: #666;">
-        <strong>Legend:</strong> 
-        <span class="confidence-high">●</span> High confidence (>0.8) |
-        <span class="confidence-medium">●</span> Medium confidence (0.6-0.8) |
-        <span class="confidence-low">●</span> Low confidence (<0.6)
-    </p>
-    """
+    parts.append(ENTITY_TABLE_FOOTER)
     
-    return table_html
+    return "".join(parts)
 
-def create_text_diff(original: str, annotated: str) -> str:
-    """Create a side-by-side diff view of original and processed text."""
-    # Strip annotations for comparison
-    processed = strip_markdown_annotations(annotated)
+def create_text_diff(original: str, processed: str) -> str:
+    """Create a side-by-side diff view of original and processed text.
+    
+    ``processed`` is the model output with annotations already stripped.
+    """
+    # Common case: the model only added annotations, so skip difflib entirely
+    if processed == original:
+        return "No differences found between original and processed text (annotations removed)."
     
     # Create diff
+    original_lines = original.splitlines(keepends=True)
+    processed_lines = processed.splitlines(keepends=True)
+    
+    # difflib is quadratic in the worst case - summarize instead of diffing huge texts
+    if max(len(original_lines), len(processed_lines)) > MAX_DIFF_LINES:
+        return (
+            f"The processed text differs from the original, but it is too long for a line-by-line diff "
+            f"({len(original_lines):,} vs {len(processed_lines):,} lines, limit {MAX_DIFF_LINES:,})."
+        )
+    
     diff = difflib.unified_diff(
-        original.splitlines(keepends=True),
-        processed.splitlines(keepends=True),
+        original_lines,
+        processed_lines,
         fromfile='Original Text',
         tofile='Processed Text',
         lineterm=''
@@ -222,40 +411,126 @@ def create_text_diff(original: str, annotated: str) -> str:
     
     return f"```diff\n{diff_text}\n```"
 
-def process_ner(text: str, labels_text: str) -> Tuple[str, str, str, str]:
-    """Process the text for NER and return all four outputs."""
-    if not text.strip():
-        return "Please enter some text to process.", "", "", ""
+def render_outputs(original: str, ner_result: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Build the visualization, entity table and stripped text for a NER result, reusing recent renders."""
+    key = (original, id(ner_result))
+    with _render_cache_lock:
+        cached = _render_cache.get(key)
+        if cached is not None and cached[0] is ner_result:
+            _render_cache.move_to_end(key)
+            return cached[1]
+    
+    annotated_text = ner_result.get("annotated_text", original)
+    
+    # Find annotations once and share them between the output builders
+    annotations = find_annotations(annotated_text)
+    stripped_text = strip_markdown_annotations(annotated_text, annotations)
+    
+    # Create visualizations
+    visualization = create_entity_visualization(ner_result, annotations)
+    entity_table = create_entity_table(ner_result)
     
+    outputs = (visualization, entity_table, stripped_text)
+    with _render_cache_lock:
+        _render_cache[key] = (ner_result, outputs)
+        _render_cache.move_to_end(key)
+        while len(_render_cache) > RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+    
+    return outputs
+
+def show_text_diff(diff_source: Optional[Tuple[str, str]]) -> str:
+    """Build the diff view on demand from the (original, stripped) texts of the last run."""
+    if not diff_source:
+        return DIFF_PLACEHOLDER
+    original, stripped_text = diff_source
+    return create_text_diff(original, stripped_text)
+
+def refresh_text_diff(diff_source: Optional[Tuple[str, str]], diff_tab_open: bool) -> str:
+    """After processing, only build the diff if the diff tab is currently being viewed."""
+    if diff_tab_open:
+        return show_text_diff(diff_source)
+    return DIFF_PLACEHOLDER
+
+def check_labels_input(labels_text: str) -> Tuple[List[str], Optional[str]]:
+    """Parse the labels input, returning the labels and an error message if they are unusable."""
     if not labels_text.strip():
-        return "Please enter at least one entity label.", "", "", ""
+        return [], "Please enter at least one entity label."
+    
+    labels = list(parse_labels_input(labels_text))
+    
+    if not labels:
+        return [], "Please enter valid entity labels separated by commas."
+    
+    if len(labels) > MAX_LABELS:
+        return [], f"Too many entity labels ({len(labels)}). Please use at most {MAX_LABELS}."
+    
+    return labels, None
+
+def process_ner_batch(texts_text: str, labels_text: str) -> str:
+    """Annotate several blank-line-separated texts, sharing LLM requests between them."""
+    texts = [t.strip() for t in _BATCH_SPLIT_RE.split(texts_text) if t.strip()]
+    if not texts:
+        return "Please enter some text to process."
+    
+    total_length = sum(len(t) for t in texts)
+    if total_length > MAX_TEXT_LENGTH:
+        return f"Input texts are too long ({total_length:,} characters). Please limit them to {MAX_TEXT_LENGTH:,} characters."
+    
+    labels, labels_error = check_labels_input(labels_text)
+    if labels_error:
+        return labels_error
+    
+    try:
+        logger.info("Processing %d texts with labels: %s", len(texts), labels)
+        results = get_llm_processor().perform_ner_batch(texts, labels)
+        return "\n\n---\n\n".join(r.get("annotated_text", t) for t, r in zip(texts, results))
+    except Exception as e:
+        error_msg = f"Error processing texts: {str(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+def process_ner(text: str, labels_text: str) -> Iterator[Tuple[str, str, str, Optional[Tuple[str, str]]]]:
+    """Process the text for NER, streaming the annotated text and entity table before yielding all outputs.
+    
+    The last element is the (original, stripped) text pair used to build the diff view on demand.
+    """
+    if not text.strip():
+        yield "Please enter some text to process.", "", "", None
+        return
+    
+    if len(text) > MAX_TEXT_LENGTH:
+        yield f"Input text is too long ({len(text):,} characters). Please limit it to {MAX_TEXT_LENGTH:,} characters.", "", "", None
+        return
     
     try:
         # Parse labels
-        labels = parse_labels_input(labels_text)
+        labels, labels_error = check_labels_input(labels_text)
+        if labels_error:
+            yield labels_error, "", "", None
+            return
         
-        if not labels:
-            return "Please enter valid entity labels separated by commas.", "", "", ""
-        
-        # Perform NER
-        logger.info(f"Processing text with labels: {labels}")
-        ner_result = llm_processor.perform_ner(text, labels)
-        print(ner_result)
+        # Perform NER, showing the annotated text and completed entities as they stream in
+        logger.info("Processing text with labels: %s", labels)
+        ner_result = None
+        for ner_result in cached_perform_ner_stream(text, labels):
+            if ner_result.get("partial"):
+                partial_table = create_entity_table(ner_result) if ner_result["entities"] else ""
+                yield ner_result["annotated_text"], "", partial_table, None
+        logger.debug("NER result: %s", ner_result)
         
         # Extract annotated text
         annotated_text = ner_result.get("annotated_text", text)
         
         # Create visualizations
-        visualization = create_entity_visualization(ner_result)
-        entity_table = create_entity_table(ner_result)
-        diff_output = create_text_diff(text, annotated_text)
+        visualization, entity_table, stripped_text = render_outputs(text, ner_result)
         
-        return annotated_text, visualization, entity_table, diff_output
+        yield annotated_text, visualization, entity_table, (text, stripped_text)
         
     except Exception as e:
         error_msg = f"Error processing text: {str(e)}"
         logger.error(error_msg)
-        return error_msg, "", "", ""
+        yield error_msg, "", "", None
 
 def update_example_labels():
     """Provide example labels for common NER tasks."""
@@ -298,36 +573,53 @@ with gr.Blocks(title="NER Demo with LLM", theme=gr.themes.Soft()) as demo:
             with gr.Row():
                 process_btn = gr.Button("Process Text", variant="primary", scale=2)
                 example_btn = gr.Button("Load Example Labels", variant="secondary", scale=1)
+            
+            with gr.Accordion("Batch: several texts at once", open=False):
+                batch_input = gr.Textbox(
+                    label="Texts to Process",
+                    placeholder="Separate texts with a blank line...",
+                    lines=6,
+                    info="Texts are sent together in shared requests, without grounding"
+                )
+                batch_btn = gr.Button("Process Texts", variant="secondary")
+                batch_output = gr.Textbox(
+                    label="Annotated Texts (Markdown)",
+                    lines=8
+                )
         
         with gr.Column(scale=2):
             gr.Markdown("### Results")
             
             with gr.Tabs():
-                with gr.Tab("📝 Markdown Output"):
+                with gr.Tab("📝 Markdown Output") as markdown_tab:
                     markdown_output = gr.Textbox(
                         label="Annotated Text (Markdown)",
                         lines=8,
                         info="Text with entities annotated as [entity](LABEL)"
                     )
                 
-                with gr.Tab("🎨 Visualization"):
+                with gr.Tab("🎨 Visualization") as visualization_tab:
                     visualization_output = gr.HTML(
                         label="Entity Visualization",
                         value="<p style='color: #666; font-style: italic;'>Processed text will appear here with color-coded entities and Wikidata links</p>"
                     )
                 
-                with gr.Tab("🔍 Entity Validation"):
+                with gr.Tab("🔍 Entity Validation") as entity_table_tab:
                     entity_table_output = gr.HTML(
                         label="Entity Validation Table",
                         value="<p style='color: #666; font-style: italic;'>Entity validation table with Wikidata IDs and confidence scores will appear here</p>"
                     )
                 
-                with gr.Tab("📊 Text Diff"):
+                with gr.Tab("📊 Text Diff") as diff_tab:
                     diff_output = gr.Markdown(
                         label="Difference View",
-                        value="*Text differences will appear here*"
+                        value=DIFF_PLACEHOLDER
                     )
     
+    # Inputs for the lazily built diff view
+    diff_source = gr.State(None)
+    diff_tab_open = gr.State(False)
+    
     # Add some examples
     gr.Markdown("""
     ### Example Texts to Try:
@@ -340,7 +632,21 @@ with gr.Blocks(title="NER Demo with LLM", theme=gr.themes.Soft()) as demo:
     process_btn.click(
         fn=process_ner,
         inputs=[text_input, labels_input],
-        outputs=[markdown_output, visualization_output, entity_table_output, diff_output]
+        outputs=[markdown_output, visualization_output, entity_table_output, diff_source],
+        api_name="process_ner",
+        show_progress="minimal"
+    ).then(
+        fn=refresh_text_diff,
+        inputs=[diff_source, diff_tab_open],
+        outputs=diff_output
+    )
+    
+    batch_btn.click(
+        fn=process_ner_batch,
+        inputs=[batch_input, labels_input],
+        outputs=batch_output,
+        api_name="process_ner_batch",
+        show_progress="minimal"
     )
     
     example_btn.click(
@@ -352,16 +658,40 @@ with gr.Blocks(title="NER Demo with LLM", theme=gr.themes.Soft()) as demo:
     text_input.submit(
         fn=process_ner,
         inputs=[text_input, labels_input],
-        outputs=[markdown_output, visualization_output, entity_table_output, diff_output]
+        outputs=[markdown_output, visualization_output, entity_table_output, diff_source]
+    ).then(
+        fn=refresh_text_diff,
+        inputs=[diff_source, diff_tab_open],
+        outputs=diff_output
     )
     
     labels_input.submit(
         fn=process_ner,
         inputs=[text_input, labels_input],
-        outputs=[markdown_output, visualization_output, entity_table_output, diff_output]
+        outputs=[markdown_output, visualization_output, entity_table_output, diff_source]
+    ).then(
+        fn=refresh_text_diff,
+        inputs=[diff_source, diff_tab_open],
+        outputs=diff_output
+    )
+    
+    # Only build the diff when its tab is opened
+    diff_tab.select(
+        fn=lambda source: (show_text_diff(source), True),
+        inputs=diff_source,
+        outputs=[diff_output, diff_tab_open]
     )
+    for other_tab in (markdown_tab, visualization_tab, entity_table_tab):
+        other_tab.select(fn=lambda: False, outputs=diff_tab_open)
 
 if __name__ == "__main__":
+    # Warm up the GenAI connection in the background so the first request doesn't
+    # pay for the TLS handshake and token fetch (set LLM_WARMUP=0 to skip)
+    if os.environ.get("LLM_WARMUP", "1") != "0":
+        threading.Thread(target=warm_up_llm_processor, daemon=True).start()
+    
+    # Let several users' LLM calls run at once instead of queueing behind each other
+    demo.queue(default_concurrency_limit=4, max_size=64)
     demo.launch(
         server_name="0.0.0.0",
         server_port=7860,
@@ -1,15 +1,167 @@
 import json
 import logging
+import random
 import re
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 import os
 import time
-from .prompts import prompt_pronouns, prompt_coreference, prompt_ner
+from .prompts import prompt_pronouns, prompt_coreference, prompt_ner, prompt_ner_json, prompt_ner_batch
 
 logger = logging.getLogger(__name__)
 
+# Wikidata item IDs: "Q" followed by ASCII digits
+_WIKIDATA_ID_RE = re.compile(r'Q\d+', re.ASCII)
+
+# Values the model uses to say it has no Wikidata ID; dropped without a warning
+_WIKIDATA_ID_PLACEHOLDERS = frozenset({"N/A", "None", "NONE", "null"})
+
+# Sections and fields of the structured text NER response
+_ANNOTATED_TEXT_RE = re.compile(r'ANNOTATED TEXT:\s*\n(.+?)(?=\n\nENTITIES FOUND:|$)', re.DOTALL)
+_ANNOTATED_HEADER = "ANNOTATED TEXT:"
+_ENTITIES_HEADER = "ENTITIES FOUND:"
+_ENTITIES_FOUND_RE = re.compile(r'ENTITIES FOUND:\s*\n(.+)', re.DOTALL)
+_ENTITY_BLOCK_SPLIT_RE = re.compile(r'\n(?=- Entity:)')
+_ENTITY_RE = re.compile(r'- Entity:\s*(.+?)(?=\n|$)', re.MULTILINE)
+_LABEL_RE = re.compile(r'Label:\s*(.+?)(?=\n|$)', re.MULTILINE)
+_POSITION_RE = re.compile(r'Position:\s*(\d+)-(\d+)')
+_WIKIDATA_RE = re.compile(r'Wikidata ID:\s*(.+?)(?=\n|$)', re.MULTILINE)
+_DESCRIPTION_RE = re.compile(r'Description:\s*(.+?)(?=\n|$)', re.MULTILINE)
+_CONFIDENCE_RE = re.compile(r'Confidence:\s*([0-9.]+)')
+
+# Section delimiter of batched NER responses, e.g. "===RESULT 3==="
+_BATCH_RESULT_RE = re.compile(r'^===RESULT (\d+)===[ \t]*$', re.MULTILINE)
+
+# Texts per batched request; kept small so all results fit in max_output_tokens
+NER_BATCH_SIZE = 8
+
+def _split_ner_prompt(template: str) -> Tuple[str, str, str]:
+    """Split an NER template around its {labels} and {text} placeholders"""
+    head, _, rest = template.partition("{labels}")
+    mid, _, tail = rest.partition("{text}")
+    return head, mid, tail
+
+
+# The NER prompts split once, so building a prompt is a plain concatenation
+# instead of a str.format parse of the whole template
+_NER_PROMPT_PARTS = _split_ner_prompt(prompt_ner)
+_NER_JSON_PROMPT_PARTS = _split_ner_prompt(prompt_ner_json)
+
+
+def _format_ner_prompt(labels_str: str, text: str, use_grounding: bool = True) -> str:
+    """Equivalent to prompt_ner.format(labels=labels_str, text=text), or prompt_ner_json without grounding"""
+    head, mid, tail = _NER_PROMPT_PARTS if use_grounding else _NER_JSON_PROMPT_PARTS
+    return f"{head}{labels_str}{mid}{text}{tail}"
+
+# Client and generation settings shared by every LLMProcessor
+_HTTP_OPTIONS = types.HttpOptions(api_version="v1")
+
+_SAFETY_CATEGORIES = (
+    "HARM_CATEGORY_HARASSMENT",
+    "HARM_CATEGORY_HATE_SPEECH",
+    "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+    "HARM_CATEGORY_DANGEROUS_CONTENT",
+)
+_SAFETY_MEDIUM = [types.SafetySetting(category=c, threshold="BLOCK_MEDIUM_AND_ABOVE") for c in _SAFETY_CATEGORIES]
+_SAFETY_HIGH = [types.SafetySetting(category=c, threshold="BLOCK_ONLY_HIGH") for c in _SAFETY_CATEGORIES]
+
+# Define the grounding tool for Google Search (following Vertex AI docs)
+_GROUNDING_TOOL = types.Tool(
+    google_search=types.GoogleSearch()
+)
+
+# Generation config with appropriate token limits
+_BASE_CONFIG = types.GenerateContentConfig(
+    temperature=0.1,
+    top_p=0.8,
+    max_output_tokens=8192,  # Maximum allowed by API (8193 exclusive)
+    response_mime_type="application/json",
+    safety_settings=_SAFETY_MEDIUM
+)
+
+# JSON shape read by the JSON branch of _parse_text_response; passing it as the
+# response schema makes the model decode exactly this structure (prompt_ner_json
+# describes the same fields)
+_NER_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "annotated_text": {"type": "STRING"},
+        "entities": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "text": {"type": "STRING"},
+                    "label": {"type": "STRING"},
+                    "start_pos": {"type": "INTEGER"},
+                    "end_pos": {"type": "INTEGER"},
+                    "wikidata_id": {"type": "STRING"},
+                    "description": {"type": "STRING"},
+                    "confidence": {"type": "NUMBER"},
+                },
+                "required": ["text", "label"],
+            },
+        },
+    },
+    "required": ["annotated_text", "entities"],
+}
+
+# Special config for NER that returns JSON (simplified without grounding first)
+_NER_CONFIG = types.GenerateContentConfig(
+    temperature=0.1,
+    top_p=0.8,
+    max_output_tokens=8192,
+    response_mime_type="application/json",  # JSON for structured entity data
+    response_schema=_NER_RESPONSE_SCHEMA,
+    safety_settings=_SAFETY_MEDIUM
+)
+
+# Config for batched NER - plain text so the ===RESULT i=== sections survive
+_NER_BATCH_CONFIG = types.GenerateContentConfig(
+    temperature=0.1,
+    top_p=0.8,
+    max_output_tokens=8192,
+    safety_settings=_SAFETY_MEDIUM
+)
+
+# Config with grounding (following Vertex AI documentation) - relaxed safety settings
+_NER_CONFIG_WITH_GROUNDING = types.GenerateContentConfig(
+    temperature=1.0,  # Documentation recommends 1.0 for ideal grounding results
+    tools=[_GROUNDING_TOOL],  # Enable grounding for entity resolution
+    safety_settings=_SAFETY_HIGH
+)
+
+# Transient API failures (rate limiting, overload, timeouts) are retried with
+# exponential backoff before falling back to a request without grounding
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 2
+RETRY_INITIAL_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an API error is transient and worth retrying with the same request"""
+    return isinstance(error, errors.APIError) and error.code in _RETRYABLE_STATUS_CODES
+
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter so concurrent requests don't retry in lockstep"""
+    delay = min(RETRY_MAX_DELAY, RETRY_INITIAL_DELAY * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+@lru_cache(maxsize=8)
+def _get_client(project_id: str, location: str) -> genai.Client:
+    """Create one Vertex AI client per project/location; the client is safe to share across threads"""
+    return genai.Client(
+        vertexai=True,
+        project=project_id,
+        location=location,
+        http_options=_HTTP_OPTIONS
+    )
+
 
 class LLMProcessor:
     """Processes Wikipedia data using Google GenAI with Vertex AI backend"""
@@ -22,78 +174,77 @@ class LLMProcessor:
         self.location = location
         self.model_name = model_name
         
-        # Initialize the client with Vertex AI backend
-        self.http_options = types.HttpOptions(api_version="v1")
-        self.client = genai.Client(
-            vertexai=True, 
-            project=project_id, 
-            location=location,
-            http_options=self.http_options
-        )
-        
-        # Define the grounding tool for Google Search (following Vertex AI docs)
-        self.grounding_tool = types.Tool(
-            google_search=types.GoogleSearch()
-        )
-        
-        # Generation config with appropriate token limits
-        self.base_config = types.GenerateContentConfig(
-            temperature=0.1,
-            top_p=0.8,
-            max_output_tokens=8192,  # Maximum allowed by API (8193 exclusive)
-            response_mime_type="application/json",
-            safety_settings=[
-                types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_MEDIUM_AND_ABOVE"),
-                types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_MEDIUM_AND_ABOVE"),
-                types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_MEDIUM_AND_ABOVE"),
-                types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_MEDIUM_AND_ABOVE"),
-            ]
-        )
+        # Initialize the client with Vertex AI backend (shared per project/location)
+        self.http_options = _HTTP_OPTIONS
+        self.client = _get_client(project_id, location)
         
-        # Special config for NER that returns JSON (simplified without grounding first)
-        self.ner_config = types.GenerateContentConfig(
-            temperature=0.1,
-            top_p=0.8,
-            max_output_tokens=8192,
-            response_mime_type="application/json",  # JSON for structured entity data
-            safety_settings=[
-                types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_MEDIUM_AND_ABOVE"),
-                types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_MEDIUM_AND_ABOVE"),
-                types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_MEDIUM_AND_ABOVE"),
-                types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_MEDIUM_AND_ABOVE"),
-            ]
-        )
+        # Generation configs are immutable in use, so instances share the module-level ones
+        self.grounding_tool = _GROUNDING_TOOL
+        self.base_config = _BASE_CONFIG
+        self.ner_config = _NER_CONFIG
+        self.ner_batch_config = _NER_BATCH_CONFIG
+        self.ner_config_with_grounding = _NER_CONFIG_WITH_GROUNDING
         
-        # Config with grounding (following Vertex AI documentation) - relaxed safety settings
-        self.ner_config_with_grounding = types.GenerateContentConfig(
-            temperature=1.0,  # Documentation recommends 1.0 for ideal grounding results
-            tools=[self.grounding_tool],  # Enable grounding for entity resolution
-            safety_settings=[
-                types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_ONLY_HIGH"),
-                types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_ONLY_HIGH"),
-                types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_ONLY_HIGH"),
-                types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_ONLY_HIGH"),
-            ]
-        )
-        
-
-        
-        logger.info(f"Initialized GenAI client with Vertex AI backend for project {project_id}")
+        logger.info("Initialized GenAI client with Vertex AI backend for project %s", project_id)
+    
+    def warm_up(self) -> None:
+        """Open the connection and fetch credentials ahead of the first NER request"""
+        try:
+            # count_tokens is the cheapest authenticated call - nothing is generated
+            self.client.models.count_tokens(model=self.model_name, contents="warmup")
+            logger.info("GenAI client warmed up")
+        except Exception as e:
+            logger.warning(f"GenAI client warm-up failed: {str(e)}")
+    
+    def _generate_content(self, prompt: str, config: types.GenerateContentConfig) -> types.GenerateContentResponse:
+        """Call generate_content, retrying transient API errors with backoff"""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=config
+                )
+            except Exception as e:
+                if attempt == MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"Transient API error ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def _generate_content_stream(self, prompt: str, config: types.GenerateContentConfig) -> Iterator[types.GenerateContentResponse]:
+        """Stream generate_content chunks, retrying transient API errors that occur before the first chunk"""
+        for attempt in range(MAX_RETRIES + 1):
+            received = False
+            try:
+                for chunk in self.client.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=config
+                ):
+                    received = True
+                    yield chunk
+                return
+            except Exception as e:
+                # Once chunks have been passed on, the stream can't be restarted transparently
+                if received or attempt == MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"Transient API error while streaming ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
     
     def _parse_text_response(self, response_text: str) -> Dict[str, Any]:
         """Parse the structured text response into JSON format - handles both text and JSON"""
-        import re
-        import json
-        
         # Initialize result structure
         result = {
             "annotated_text": "",
             "entities": []
         }
         
-        # First, try to parse as JSON (fallback case)
+        # First, try to parse as JSON (fallback case) - only an object can be
+        # handled below, so skip the decoder for structured text responses
         try:
-            json_data = json.loads(response_text)
+            json_data = json.loads(response_text) if response_text.lstrip().startswith("{") else None
             if isinstance(json_data, dict):
                 if "annotated_text" in json_data:
                     result["annotated_text"] = json_data["annotated_text"]
@@ -126,8 +277,14 @@ class LLMProcessor:
                         
                         # Handle Wikidata ID
                         wikidata_id = entity_data.get("wikidata_id")
-                        if wikidata_id and wikidata_id != "null" and wikidata_id is not None:
-                            entity["wikidata_id"] = str(wikidata_id)
+                        if wikidata_id is not None:
+                            wikidata_id = str(wikidata_id).strip()
+                        if wikidata_id and wikidata_id not in _WIKIDATA_ID_PLACEHOLDERS:
+                            if self._validate_wikidata_id(entity["text"], wikidata_id):
+                                entity["wikidata_id"] = wikidata_id
+                            else:
+                                logger.warning(f"Invalid Wikidata ID {wikidata_id} for {entity['text']}, removing")
+                                entity["wikidata_id"] = ""
                         else:
                             entity["wikidata_id"] = ""
                         
@@ -143,81 +300,136 @@ class LLMProcessor:
         
         # Parse as structured text format
         # Extract annotated text
-        annotated_match = re.search(r'ANNOTATED TEXT:\s*\n(.+?)(?=\n\nENTITIES FOUND:|$)', response_text, re.DOTALL)
+        annotated_match = _ANNOTATED_TEXT_RE.search(response_text)
         if annotated_match:
             result["annotated_text"] = annotated_match.group(1).strip()
         
         # Extract entities section
-        entities_match = re.search(r'ENTITIES FOUND:\s*\n(.+)', response_text, re.DOTALL)
+        entities_match = _ENTITIES_FOUND_RE.search(response_text)
         if entities_match:
             entities_text = entities_match.group(1)
             
-            # Parse individual entities
-            # Look for entity blocks starting with "- Entity:"
-            entity_blocks = re.split(r'\n(?=- Entity:)', entities_text)
+            result["entities"] = self._parse_entity_blocks(entities_text)
+        
+        return result
+    
+    def _parse_entity_blocks(self, entities_text: str) -> List[Dict[str, Any]]:
+        """Parse the "- Entity:" blocks of an ENTITIES FOUND section"""
+        entities = []
+        
+        # Look for entity blocks starting with "- Entity:"
+        entity_blocks = _ENTITY_BLOCK_SPLIT_RE.split(entities_text)
+        
+        for block in entity_blocks:
+            if not block.strip():
+                continue
+                
+            entity = {}
+            
+            # Extract entity fields using regex - handle multiline format
+            entity_match = _ENTITY_RE.search(block)
+            label_match = _LABEL_RE.search(block)
+            position_match = _POSITION_RE.search(block)
+            wikidata_match = _WIKIDATA_RE.search(block)
+            description_match = _DESCRIPTION_RE.search(block)
+            confidence_match = _CONFIDENCE_RE.search(block)
             
-            for block in entity_blocks:
-                if not block.strip():
-                    continue
-                    
-                entity = {}
+            if entity_match and label_match:
+                entity["text"] = entity_match.group(1).strip()
+                entity["label"] = label_match.group(1).strip()
                 
-                # Extract entity fields using regex - handle multiline format
-                entity_match = re.search(r'- Entity:\s*(.+?)(?=\n|$)', block, re.MULTILINE)
-                label_match = re.search(r'Label:\s*(.+?)(?=\n|$)', block, re.MULTILINE)
-                position_match = re.search(r'Position:\s*(\d+)-(\d+)', block)
-                wikidata_match = re.search(r'Wikidata ID:\s*(.+?)(?=\n|$)', block, re.MULTILINE)
-                description_match = re.search(r'Description:\s*(.+?)(?=\n|$)', block, re.MULTILINE)
-                confidence_match = re.search(r'Confidence:\s*([0-9.]+)', block)
+                if position_match:
+                    entity["start_pos"] = int(position_match.group(1))
+                    entity["end_pos"] = int(position_match.group(2))
                 
-                if entity_match and label_match:
-                    entity["text"] = entity_match.group(1).strip()
-                    entity["label"] = label_match.group(1).strip()
-                    
-                    if position_match:
-                        entity["start_pos"] = int(position_match.group(1))
-                        entity["end_pos"] = int(position_match.group(2))
-                    
-                    if wikidata_match:
-                        wikidata_id = wikidata_match.group(1).strip()
-                        # Clean up common variations and validate format
-                        if wikidata_id and wikidata_id not in ["N/A", "None", "NONE", "null"]:
-                            # Basic validation: should be Q followed by numbers
-                            if wikidata_id.startswith("Q") and wikidata_id[1:].isdigit():
-                                entity["wikidata_id"] = wikidata_id
-                            else:
-                                logger.warning(f"Invalid Wikidata ID format: {wikidata_id}")
-                                entity["wikidata_id"] = ""
+                if wikidata_match:
+                    wikidata_id = wikidata_match.group(1).strip()
+                    # Clean up common variations and validate format
+                    if wikidata_id and wikidata_id not in _WIKIDATA_ID_PLACEHOLDERS:
+                        # Validate once here: Q followed by numbers, within a plausible range
+                        if self._validate_wikidata_id(entity["text"], wikidata_id):
+                            entity["wikidata_id"] = wikidata_id
                         else:
+                            logger.warning(f"Invalid Wikidata ID {wikidata_id} for {entity['text']}, removing")
                             entity["wikidata_id"] = ""
-                    
-                    if description_match:
-                        entity["description"] = description_match.group(1).strip()
-                    
-                    if confidence_match:
-                        entity["confidence"] = float(confidence_match.group(1))
                     else:
-                        entity["confidence"] = 0.8  # Default confidence
-                    
-                    result["entities"].append(entity)
+                        entity["wikidata_id"] = ""
+                
+                if description_match:
+                    entity["description"] = description_match.group(1).strip()
+                
+                if confidence_match:
+                    entity["confidence"] = float(confidence_match.group(1))
+                else:
+                    entity["confidence"] = 0.8  # Default confidence
+                
+                entities.append(entity)
         
-        return result
+        return entities
     
     def _validate_wikidata_id(self, entity_text: str, wikidata_id: str) -> bool:
         """Basic validation of Wikidata ID format and reasonableness"""
-        if not wikidata_id or not wikidata_id.startswith("Q"):
+        if not wikidata_id or not _WIKIDATA_ID_RE.fullmatch(wikidata_id):
             return False
         
-        # Check if it's a reasonable number (not too high)
-        try:
-            qnum = int(wikidata_id[1:])
-            # Most real Wikidata entities are below Q100000000
-            if qnum > 100000000:
-                logger.warning(f"Suspicious high Wikidata ID {wikidata_id} for entity '{entity_text}'")
-                return False
-            return True
-        except ValueError:
+        # Check if it's a reasonable number (not too high) - equal-length digit
+        # strings compare like the numbers, so no int is needed
+        digits = wikidata_id[1:].lstrip("0")
+        # Most real Wikidata entities are below Q100000000
+        if len(digits) > 9 or (len(digits) == 9 and digits > "100000000"):
+            logger.warning(f"Suspicious high Wikidata ID {wikidata_id} for entity '{entity_text}'")
             return False
+        return True
+    
+    def _extract_grounding_info(self, candidate) -> Dict[str, Any]:
+        """Collect grounding search queries and sources from a response candidate"""
+        grounding_info = {}
+        if hasattr(candidate, 'grounding_metadata') and candidate.grounding_metadata:
+            grounding_info = {
+                "search_queries": getattr(candidate.grounding_metadata, 'web_search_queries', []),
+                "grounding_sources": getattr(candidate.grounding_metadata, 'sources', [])
+            }
+            logger.debug("Grounding metadata found: %s", grounding_info)
+        return grounding_info
+    
+    def _build_ner_result(self, result: str, grounding_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse and validate raw model output, returning None if it is unusable"""
+        try:
+            # Parse the structured text response
+            parsed_result = self._parse_text_response(result)
+            
+            # Add grounding metadata to the result
+            if grounding_info:
+                parsed_result["grounding_metadata"] = grounding_info
+            
+            # Validate the expected structure - _parse_text_response always returns both
+            # keys, so a response without an ANNOTATED TEXT section shows up as empty text
+            # Wikidata IDs are already validated by _parse_text_response
+            if parsed_result["annotated_text"]:
+                logger.info("Successfully parsed NER result with %d entities", len(parsed_result["entities"]))
+                return parsed_result
+            else:
+                logger.warning(f"Response has no annotated text: {result[:200]}")
+                
+        except Exception as e:
+            logger.warning(f"Failed to parse text response: {e}")
+            logger.warning(f"Raw response that failed to parse: {result}")
+        
+        return None
+    
+    def _partial_annotated_text(self, annotated: str, complete: bool) -> str:
+        """Clean up the annotated text section of an incomplete structured text response.
+        
+        ``annotated`` is the text after "ANNOTATED TEXT:", up to "ENTITIES FOUND:" once
+        ``complete``.
+        """
+        if not complete:
+            # The chunk may have ended partway through the header - hold back a last
+            # line that could still turn into "ENTITIES FOUND:"
+            tail_start = annotated.rfind("\n") + 1
+            if tail_start and _ENTITIES_HEADER.startswith(annotated[tail_start:]):
+                annotated = annotated[:tail_start]
+        return annotated.strip()
     
     def perform_ner(self, text: str, labels: List[str], use_grounding: bool = True) -> Dict[str, Any]:
         """
@@ -235,76 +447,36 @@ class LLMProcessor:
             # Format the labels for the prompt
             labels_str = ", ".join(labels)
             
-            # Create the prompt
-            prompt = prompt_ner.format(labels=labels_str, text=text)
-            logger.info(f"Generated prompt: {prompt[:200]}...")
+            # Create the prompt - the JSON prompt matches the non-grounded config's schema
+            prompt = _format_ner_prompt(labels_str, text, use_grounding)
+            logger.debug("Generated prompt: %.200s...", prompt)
             
             # Choose config based on grounding preference
             config_to_use = self.ner_config_with_grounding if use_grounding else self.ner_config
-            logger.info(f"Using grounding: {use_grounding}")
+            logger.info("Using grounding: %s", use_grounding)
             
             # Generate content
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=config_to_use
-            )
+            response = self._generate_content(prompt, config_to_use)
             
-            logger.info(f"Response received: {response}")
+            logger.debug("Response received: %s", response)
             
             # Extract the response with grounding metadata
             if response.candidates and len(response.candidates) > 0:
                 candidate = response.candidates[0]
                 
                 # Check for grounding metadata
-                grounding_info = {}
-                if hasattr(candidate, 'grounding_metadata') and candidate.grounding_metadata:
-                    grounding_info = {
-                        "search_queries": getattr(candidate.grounding_metadata, 'web_search_queries', []),
-                        "grounding_sources": getattr(candidate.grounding_metadata, 'sources', [])
-                    }
-                    logger.info(f"Grounding metadata found: {grounding_info}")
+                grounding_info = self._extract_grounding_info(candidate)
                 
                 if candidate.content and candidate.content.parts:
                     result = candidate.content.parts[0].text.strip()
-                    logger.info(f"Raw response text: {result}")
+                    logger.debug("Raw response text: %s", result)
                     
                     if result:  # Check if we have actual content
-                        try:
-                            # Parse the structured text response
-                            parsed_result = self._parse_text_response(result)
-                            
-                            # Add grounding metadata to the result
-                            if grounding_info:
-                                parsed_result["grounding_metadata"] = grounding_info
-                            
-                            # Validate the expected structure
-                            if "annotated_text" in parsed_result and "entities" in parsed_result:
-                                # Validate Wikidata IDs
-                                validated_entities = []
-                                for entity in parsed_result["entities"]:
-                                    if entity.get("wikidata_id"):
-                                        if self._validate_wikidata_id(entity["text"], entity["wikidata_id"]):
-                                            validated_entities.append(entity)
-                                        else:
-                                            logger.warning(f"Invalid Wikidata ID {entity['wikidata_id']} for {entity['text']}, removing")
-                                            entity["wikidata_id"] = ""
-                                            validated_entities.append(entity)
-                                    else:
-                                        validated_entities.append(entity)
-                                
-                                parsed_result["entities"] = validated_entities
-                                logger.info(f"Successfully parsed NER result with {len(parsed_result['entities'])} entities")
-                                return parsed_result
-                            else:
-                                logger.warning(f"Response missing expected fields. Keys found: {list(parsed_result.keys())}")
-                                
-                        except Exception as e:
-                            logger.warning(f"Failed to parse text response: {e}")
-                            logger.warning(f"Raw response that failed to parse: {result}")
+                        parsed_result = self._build_ner_result(result, grounding_info)
+                        if parsed_result is not None:
+                            return parsed_result
                     else:
                         logger.warning("Empty response content received")
-            
             # Check if we have grounding metadata but no content (common with grounding failures)
             logger.warning("No valid response content received from the model")
             if hasattr(response, 'candidates') and response.candidates:
@@ -335,4 +507,182 @@ class LLMProcessor:
             return {
                 "annotated_text": text,
                 "entities": []
-            }
\ No newline at end of file
+            }
+    
+    def perform_ner_stream(self, text: str, labels: List[str], use_grounding: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Stream Named Entity Recognition results as the model generates them.
+        
+        Args:
+            text: The input text to process
+            labels: List of entity labels to use for annotation
+            use_grounding: Whether to use grounding tools (fallback to no grounding if fails)
+            
+        Yields:
+            Partial results of the form {"annotated_text": ..., "entities": [...], "partial": True}
+            while the response is streaming - entities are added as their blocks complete -
+            followed by one final result in the same format as perform_ner. Without grounding
+            the response is schema-constrained JSON, so only the final result is yielded
+        """
+        try:
+            # Format the labels for the prompt
+            labels_str = ", ".join(labels)
+            
+            # Create the prompt - the JSON prompt matches the non-grounded config's schema
+            prompt = _format_ner_prompt(labels_str, text, use_grounding)
+            logger.debug("Generated prompt: %.200s...", prompt)
+            
+            # Choose config based on grounding preference
+            config_to_use = self.ner_config_with_grounding if use_grounding else self.ner_config
+            logger.info("Using grounding (streaming): %s", use_grounding)
+            
+            # The response so far, and where its sections start once they have arrived,
+            # so each chunk only scans the new text instead of the whole response
+            response_so_far = ""
+            annotated_start = -1   # just after "ANNOTATED TEXT:"
+            annotated_end = -1     # at "ENTITIES FOUND:"
+            entities_offset = -1   # first entity block not parsed yet
+            grounding_info = {}
+            last_partial = ""
+            partial_entities = []
+            for chunk in self._generate_content_stream(prompt, config_to_use):
+                if chunk.candidates:
+                    grounding_info = self._extract_grounding_info(chunk.candidates[0]) or grounding_info
+                
+                if not chunk.text:
+                    continue
+                
+                # Back up far enough to catch a marker split across chunks
+                scan_from = max(0, len(response_so_far) - len(_ENTITIES_HEADER))
+                response_so_far += chunk.text
+                
+                if annotated_start < 0:
+                    found = response_so_far.find(_ANNOTATED_HEADER, scan_from)
+                    if found < 0:
+                        continue
+                    annotated_start = found + len(_ANNOTATED_HEADER)
+                
+                new_entities = []
+                if annotated_end < 0:
+                    found = response_so_far.find(_ENTITIES_HEADER, max(scan_from, annotated_start))
+                    if found >= 0:
+                        annotated_end = found
+                    partial_annotated = self._partial_annotated_text(
+                        response_so_far[annotated_start:annotated_end if found >= 0 else None], found >= 0
+                    )
+                else:
+                    partial_annotated = last_partial
+                
+                if annotated_end >= 0:
+                    if entities_offset < 0:
+                        line_end = response_so_far.find("\n", annotated_end + len(_ENTITIES_HEADER))
+                        if line_end >= 0:
+                            entities_offset = line_end + 1
+                    
+                    # Parse entity blocks as soon as the next "- Entity:" shows they are complete
+                    if entities_offset >= 0:
+                        block_end = response_so_far.rfind("\n- Entity:", entities_offset + 1)
+                        if block_end > entities_offset:
+                            new_entities = self._parse_entity_blocks(response_so_far[entities_offset:block_end])
+                            entities_offset = block_end + 1
+                
+                if partial_annotated and (partial_annotated != last_partial or new_entities):
+                    last_partial = partial_annotated
+                    partial_entities.extend(new_entities)
+                    yield {"annotated_text": partial_annotated, "entities": list(partial_entities), "partial": True}
+            
+            result = response_so_far.strip()
+            logger.debug("Raw streamed response text: %s", result)
+            
+            if result:
+                parsed_result = self._build_ner_result(result, grounding_info)
+                if parsed_result is not None:
+                    yield parsed_result
+                    return
+            else:
+                logger.warning("Empty streamed response content received")
+            
+            # If grounding was used and failed, try without grounding
+            if use_grounding:
+                logger.warning("Grounding failed while streaming, retrying without grounding...")
+                yield from self.perform_ner_stream(text, labels, use_grounding=False)
+                return
+            
+            # Final fallback: return basic structure
+            logger.warning("Using fallback response structure")
+            yield {
+                "annotated_text": text,
+                "entities": []
+            }
+            
+        except Exception as e:
+            logger.error(f"Error in streaming NER processing: {str(e)}")
+            
+            # If grounding was used and caused exception, try without grounding
+            if use_grounding:
+                logger.warning("Exception with grounding while streaming, retrying without grounding...")
+                yield from self.perform_ner_stream(text, labels, use_grounding=False)
+                return
+            
+            yield {
+                "annotated_text": text,
+                "entities": []
+            }
+    
+    def _split_batch_response(self, response_text: str) -> Dict[int, str]:
+        """Split a batched response into its ===RESULT i=== sections, keyed by i"""
+        sections = {}
+        matches = list(_BATCH_RESULT_RE.finditer(response_text))
+        for match, next_match in zip(matches, matches[1:] + [None]):
+            end = next_match.start() if next_match else len(response_text)
+            sections[int(match.group(1))] = response_text[match.end():end].strip()
+        return sections
+    
+    def _perform_ner_batch_chunk(self, texts: List[str], labels: List[str]) -> List[Dict[str, Any]]:
+        """Run one batched request; items missing from the response fall back to perform_ner"""
+        parsed = [None] * len(texts)
+        try:
+            prompt = prompt_ner_batch.format(
+                labels=", ".join(labels),
+                texts="".join(f"\n===TEXT {i}===\n{t}" for i, t in enumerate(texts, 1))
+            )
+            logger.debug("Generated batch prompt for %d texts: %.200s...", len(texts), prompt)
+            
+            response = self._generate_content(prompt, self.ner_batch_config)
+            
+            result = (response.text or "").strip()
+            logger.debug("Raw batch response text: %s", result)
+            
+            sections = self._split_batch_response(result)
+            for i in range(len(texts)):
+                section = sections.get(i + 1)
+                if section:
+                    parsed[i] = self._build_ner_result(section, {})
+        except Exception as e:
+            logger.error(f"Error in batch NER processing: {str(e)}")
+        
+        results = []
+        for text, parsed_result in zip(texts, parsed):
+            if parsed_result is None:
+                logger.warning("Batch result missing or unparsable, falling back to a single request")
+                parsed_result = self.perform_ner(text, labels, use_grounding=False)
+            results.append(parsed_result)
+        return results
+    
+    def perform_ner_batch(self, texts: List[str], labels: List[str], batch_size: int = NER_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """
+        Perform Named Entity Recognition on several texts, sharing one request per batch.
+        
+        Args:
+            texts: The input texts to process
+            labels: List of entity labels to use for annotation
+            batch_size: Maximum number of texts sent in a single request
+            
+        Returns:
+            One result per input text, in order, in the same format as perform_ner
+            (without grounding metadata, as batched requests do not use grounding)
+        """
+        results = []
+        for start in range(0, len(texts), batch_size):
+            results.extend(self._perform_ner_batch_chunk(texts[start:start + batch_size], labels))
+        return results
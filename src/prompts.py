@@ -9,20 +9,16 @@ prompt_coreference = """
 You are a coreference resolution assistant. Identify coreference relationships in the given text.
 """
 
-# NER prompt template
+# NER prompt template. The per-request fields ({labels}, {text}) come last so the
+# instructions form an identical prefix across calls, which provider-side prompt
+# caching can reuse
 prompt_ner = """
-You are an expert Named Entity Recognition (NER) system with access to grounding tools. Your task is to identify entities in the given text and use grounding to find accurate Wikidata IDs.
-
-CRITICAL INSTRUCTIONS:
-1. ONLY use Wikidata IDs that you find through grounding searches - DO NOT make up or guess Wikidata IDs
-2. If grounding does not return a clear Wikidata ID for an entity, set it to "NONE" 
-3. Search for each entity using the grounding tools before providing any Wikidata ID
-4. Double-check that the Wikidata ID matches the entity context
+You are an expert Named Entity Recognition (NER) system with access to grounding tools. Identify entities in the given text and use grounding to find accurate Wikidata IDs.
 
 Instructions:
-1. Identify entities in the text that match the provided entity labels
-2. For each entity, FIRST use grounding tools to search for "[entity name] wikidata"
-3. Extract the actual Wikidata ID (Q-number) from the grounding search results
+1. Identify clear, unambiguous entities that match the entity labels provided by the user below - use no other labels
+2. For each entity, search for "[entity name] wikidata" with the grounding tools and take its Wikidata ID (Q-number) from the results, checking that it matches the entity context
+3. ONLY use Wikidata IDs found through grounding - never invent or guess one. If grounding returns no clear Wikidata ID, use "NONE"
 4. Present your results in this structured format:
 
 ANNOTATED TEXT:
@@ -31,19 +27,70 @@ ANNOTATED TEXT:
 ENTITIES FOUND:
 For each entity, provide:
 - Entity: [entity text]
-- Label: [entity type]  
+- Label: [entity type]
 - Position: [start]-[end]
-- Wikidata ID: [ONLY use Q-numbers found in grounding results, otherwise use "NONE"]
-- Description: [description from grounding search results]
+- Wikidata ID: [Q-number from grounding results, otherwise "NONE"]
+- Description: [short description from grounding search results, at most 10 words]
 - Confidence: [0.0-1.0 based on grounding search quality]
 
-5. Only use the labels provided by the user: {labels}
-6. Be precise and only annotate clear, unambiguous entities
-7. MANDATORY: Use grounding tools to verify each entity before assigning any Wikidata ID
-8. If no clear Wikidata ID is found in grounding results, use "NONE"
+Entity labels to use: {labels}
+
+Text to analyze:
+{text}
+"""
+
+# NER prompt for requests without grounding, answered as JSON constrained to the
+# response schema in src/llm.py
+prompt_ner_json = """
+You are an expert Named Entity Recognition (NER) system. Identify entities in the given text.
+
+Instructions:
+1. Identify clear, unambiguous entities that match the entity labels provided by the user below - use no other labels
+2. Give a Wikidata ID (Q-number) only if you are certain of it, otherwise use "NONE" - never invent or guess one
+3. Answer with a JSON object with these fields:
+   - annotated_text: the complete original text with entities in markdown format: [entity](LABEL)
+   - entities: a list with one object per entity, with the fields
+     - text: the entity text
+     - label: the entity type
+     - start_pos, end_pos: character offsets of the entity in the original text
+     - wikidata_id: the Q-number, or "NONE"
+     - description: short description of the entity, at most 10 words
+     - confidence: 0.0-1.0
+
+Entity labels to use: {labels}
 
 Text to analyze:
 {text}
+"""
+
+# Batched NER prompt template: several texts share one set of instructions
+prompt_ner_batch = """
+You are an expert Named Entity Recognition (NER) system. Your task is to identify entities in each of the numbered texts below.
+
+Instructions:
+1. Identify entities in each text that match the provided entity labels
+2. Process every text independently - positions are relative to the start of that text
+3. For each TEXT_i below, output a block starting with the line ===RESULT i=== followed by:
+
+ANNOTATED TEXT:
+[Return the complete original text with entities in markdown format: [entity](LABEL)]
+
+ENTITIES FOUND:
+For each entity, provide:
+- Entity: [entity text]
+- Label: [entity type]
+- Position: [start]-[end]
+- Wikidata ID: [Q-number only if you are certain of it, otherwise "NONE"]
+- Description: [short description of the entity, at most 10 words]
+- Confidence: [0.0-1.0]
+
+4. Only use the entity labels provided by the user below
+5. Be precise and only annotate clear, unambiguous entities
+6. Never invent or guess Wikidata IDs
+7. Output exactly one ===RESULT i=== block per text, in order, even if it has no entities
+
+Entity labels to use: {labels}
 
-REMEMBER: Only use Wikidata IDs that you actually find through grounding searches. Do not invent or guess IDs.
+Texts to analyze:
+{texts}
 """